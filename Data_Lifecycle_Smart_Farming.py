@@ -28,6 +28,12 @@ import os
 import warnings
 warnings.filterwarnings('ignore')
 
+from smart_farming.imputation import build_fill_table, impute, save_fill_table
+from smart_farming.sensor_checks import WindowDeduplicator, StuckSensorDetector, run_sensor_checks
+from smart_farming.archive import write_archive, ArchiveReader
+from smart_farming.histogram import compute_histograms, merge_histograms, plot_histogram
+from smart_farming.alerts import AlertEngine, load_rules, alerts_to_frame
+
 # Styling
 sns.set_theme(style="whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
@@ -88,23 +94,30 @@ print(df['result'].value_counts())
 
 # %%
 # Visualisasi EDA
+# Histogram sensor dengan bin tetap, dihitung per chunk lalu digabung.
+# Hitungan yang sama disimpan dan dipakai ulang oleh dashboard.
+chunk_size = 5000
+histogram_counts = merge_histograms(
+    compute_histograms(df.iloc[i:i + chunk_size]) for i in range(0, len(df), chunk_size)
+)
+
 fig, axes = plt.subplots(2, 2, figsize=(16, 12))
 fig.suptitle('Exploratory Data Analysis - Smart Farming Dataset', fontsize=16, fontweight='bold')
 
 # 1. Distribusi Temperature
-axes[0, 0].hist(df['temp'], bins=30, color='#FF6B6B', edgecolor='black', alpha=0.7)
+plot_histogram(axes[0, 0], histogram_counts, 'temp', color='#FF6B6B', edgecolor='black', alpha=0.7)
 axes[0, 0].set_title('Distribusi Temperature (°C)', fontweight='bold')
 axes[0, 0].set_xlabel('Temperature')
 axes[0, 0].set_ylabel('Frekuensi')
 
 # 2. Distribusi Humidity
-axes[0, 1].hist(df['humidity'], bins=30, color='#4ECDC4', edgecolor='black', alpha=0.7)
+plot_histogram(axes[0, 1], histogram_counts, 'humidity', color='#4ECDC4', edgecolor='black', alpha=0.7)
 axes[0, 1].set_title('Distribusi Humidity (%)', fontweight='bold')
 axes[0, 1].set_xlabel('Humidity')
 axes[0, 1].set_ylabel('Frekuensi')
 
 # 3. Distribusi MOI (Moisture of Irrigation)
-axes[1, 0].hist(df['MOI'], bins=30, color='#45B7D1', edgecolor='black', alpha=0.7)
+plot_histogram(axes[1, 0], histogram_counts, 'MOI', color='#45B7D1', edgecolor='black', alpha=0.7)
 axes[1, 0].set_title('Distribusi MOI', fontweight='bold')
 axes[1, 0].set_xlabel('MOI')
 axes[1, 0].set_ylabel('Frekuensi')
@@ -124,9 +137,12 @@ plt.savefig('outputs/eda_distributions.png', dpi=150, bbox_inches='tight')
 plt.close()
 print("✅ Visualisasi EDA disimpan ke outputs/eda_distributions.png")
 
+histogram_counts.to_csv('outputs/histogram_counts.csv', index=False)
+print("✅ Hitungan histogram (bin tetap) disimpan ke outputs/histogram_counts.csv")
+
 # %% [markdown]
 # ## 3. Data Cleaning
-# Pembersihan data: handle missing values, outliers, tambah timestamp
+# Pembersihan data: handle missing values, outliers, tambah timestamp, duplikat & sensor macet
 
 # %%
 print("\n" + "=" * 60)
@@ -139,19 +155,12 @@ df_cleaned = df.copy()
 missing_before = df_cleaned.isnull().sum().sum()
 print(f"\nMissing values sebelum cleaning: {missing_before}")
 
-# Isi missing values numerik dengan median
-numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
-for col in numeric_cols:
-    if df_cleaned[col].isnull().sum() > 0:
-        df_cleaned[col].fillna(df_cleaned[col].median(), inplace=True)
-        print(f"  → Kolom '{col}': missing values diisi dengan median")
-
-# Isi missing values kategorikal dengan mode
-cat_cols = df_cleaned.select_dtypes(include=['object']).columns
-for col in cat_cols:
-    if df_cleaned[col].isnull().sum() > 0:
-        df_cleaned[col].fillna(df_cleaned[col].mode()[0], inplace=True)
-        print(f"  → Kolom '{col}': missing values diisi dengan mode")
+# Isi missing values dalam satu pass: median (numerik) dan mode (kategorikal)
+# per grup crop ID & Seedling Stage, fallback ke nilai global
+fill_table = build_fill_table(df_cleaned)
+df_cleaned, imputation_report = impute(df_cleaned, fill_table)
+for col, n in imputation_report.groupby('column')['n_imputed'].sum().items():
+    print(f"  → Kolom '{col}': {n} missing values diisi (median/mode per crop & stage)")
 
 missing_after = df_cleaned.isnull().sum().sum()
 print(f"Missing values setelah cleaning: {missing_after}")
@@ -192,7 +201,30 @@ print(f"  → Timestamp ditambahkan: {df_cleaned['timestamp'].min()} sampai {df_
 print(f"  → Interval: setiap 15 menit")
 
 # %%
-# 3d. Rename kolom agar lebih konsisten
+# 3d. Deteksi Duplikat & Sensor Macet (diproses per chunk seperti data streaming)
+print("\n--- Deteksi Duplikat & Sensor Macet ---")
+
+# Duplikat: batch yang dikirim ulang gateway (hash kolom sensor & kategorikal,
+# timestamp hanya untuk seen-set window 1 hari)
+# Sensor macet: >= 4 pembacaan MOI/temp/humidity identik berurutan per crop
+deduplicator = WindowDeduplicator(window='1D')
+stuck_detector = StuckSensorDetector(min_run=4)
+chunk_size = 5000
+chunks = (df_cleaned.iloc[i:i + chunk_size] for i in range(0, len(df_cleaned), chunk_size))
+check_results = list(run_sensor_checks(chunks, deduplicator, stuck_detector))
+
+duplicate_count = sum(n_dup for _, n_dup, _ in check_results)
+df_cleaned = pd.concat([chunk for chunk, _, _ in check_results])
+run_length = pd.concat([rl for _, _, rl in check_results])
+stuck_count = int((run_length >= stuck_detector.min_run).sum())
+stuck_summary = stuck_detector.summary()
+
+print(f"  → Baris duplikat dibuang: {duplicate_count}")
+print(f"  → Baris sensor macet (run >= {stuck_detector.min_run}): {stuck_count}")
+print(stuck_summary.to_string(index=False))
+
+# %%
+# 3e. Rename kolom agar lebih konsisten
 df_cleaned.columns = df_cleaned.columns.str.strip()
 print(f"\n✅ Data setelah cleaning: {df_cleaned.shape[0]} baris, {df_cleaned.shape[1]} kolom")
 print(f"Kolom: {list(df_cleaned.columns)}")
@@ -293,7 +325,7 @@ print("✅ Distribusi per Soil Type disimpan ke outputs/distribusi_soil_type.png
 
 # %% [markdown]
 # ## 5. Data Quality Score
-# Menghitung skor kualitas data: Accuracy, Completeness, Timeliness
+# Menghitung skor kualitas data: Accuracy, Completeness, Timeliness, Uniqueness, Sensor Health
 
 # %%
 print("\n" + "=" * 60)
@@ -322,27 +354,44 @@ print(f"   = {completeness:.4f} ({completeness*100:.2f}%)")
 now = datetime.now()
 thirty_days_ago = now - timedelta(days=30)
 recent_data = df_cleaned[df_cleaned['timestamp'] >= thirty_days_ago].shape[0]
-timeliness = recent_data / total_rows
+clean_rows = len(df_cleaned)  # setelah duplikat dibuang
+timeliness = recent_data / clean_rows
 print(f"\n📌 Timeliness = % data dalam 30 hari terakhir")
-print(f"   = {recent_data}/{total_rows}")
+print(f"   = {recent_data}/{clean_rows}")
 print(f"   = {timeliness:.4f} ({timeliness*100:.2f}%)")
 
+# 5d. Uniqueness = 1 - (baris duplikat / total)
+uniqueness = 1 - (duplicate_count / total_rows)
+print(f"\n📌 Uniqueness = 1 - (duplikat/total)")
+print(f"   = 1 - ({duplicate_count}/{total_rows})")
+print(f"   = {uniqueness:.4f} ({uniqueness*100:.2f}%)")
+
+# 5e. Sensor Health = 1 - (baris sensor macet / total)
+# (stuck_count dihitung pada data tanpa duplikat, jadi pembaginya juga clean_rows)
+sensor_health = 1 - (stuck_count / clean_rows)
+print(f"\n📌 Sensor Health = 1 - (sensor macet/total)")
+print(f"   = 1 - ({stuck_count}/{clean_rows})")
+print(f"   = {sensor_health:.4f} ({sensor_health*100:.2f}%)")
+
 # Overall Score
-overall_score = (accuracy + completeness + timeliness) / 3
+overall_score = (accuracy + completeness + timeliness + uniqueness + sensor_health) / 5
 print(f"\n{'='*40}")
 print(f"📊 OVERALL DATA QUALITY SCORE")
 print(f"{'='*40}")
 print(f"   Accuracy    : {accuracy*100:.2f}%")
 print(f"   Completeness: {completeness*100:.2f}%")
 print(f"   Timeliness  : {timeliness*100:.2f}%")
+print(f"   Uniqueness  : {uniqueness*100:.2f}%")
+print(f"   Sensor Health: {sensor_health*100:.2f}%")
 print(f"   ────────────────────────")
 print(f"   Overall     : {overall_score*100:.2f}%")
 
 # Buat visualisasi Data Quality Score
 fig, ax = plt.subplots(figsize=(8, 6))
-scores = [accuracy * 100, completeness * 100, timeliness * 100, overall_score * 100]
-labels = ['Accuracy', 'Completeness', 'Timeliness', 'Overall']
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+scores = [accuracy * 100, completeness * 100, timeliness * 100,
+          uniqueness * 100, sensor_health * 100, overall_score * 100]
+labels = ['Accuracy', 'Completeness', 'Timeliness', 'Uniqueness', 'Sensor Health', 'Overall']
+colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFEAA7', '#DDA0DD', '#96CEB4']
 bars = ax.barh(labels, scores, color=colors, edgecolor='black', height=0.6)
 
 for bar, score in zip(bars, scores):
@@ -374,6 +423,48 @@ print(f"   Jumlah baris: {df_cleaned.shape[0]}")
 print(f"   Jumlah kolom: {df_cleaned.shape[1]}")
 print(f"   Kolom: {list(df_cleaned.columns)}")
 
+save_fill_table(fill_table, 'outputs/imputation_fill_table.csv')
+imputation_report.to_csv('outputs/imputation_report.csv', index=False)
+print(f"✅ Fill table imputasi disimpan ke outputs/imputation_fill_table.csv")
+print(f"✅ Report imputasi disimpan ke outputs/imputation_report.csv")
+
+stuck_summary.to_csv('outputs/stuck_sensor_report.csv', index=False)
+print(f"✅ Report sensor macet disimpan ke outputs/stuck_sensor_report.csv")
+
+# %%
+# Arsip sensor terkompresi (timestamp origin+interval, delta/bit-packing, RLE)
+write_archive(df_cleaned, 'outputs/sensor_archive.sfa')
+csv_size = os.path.getsize('outputs/cleaned_data.csv')
+archive_size = os.path.getsize('outputs/sensor_archive.sfa')
+print(f"✅ Arsip sensor disimpan ke outputs/sensor_archive.sfa")
+print(f"   Ukuran CSV   : {csv_size / 1024:.1f} KB")
+print(f"   Ukuran arsip : {archive_size / 1024:.1f} KB ({csv_size / archive_size:.1f}x lebih kecil)")
+
+# Contoh range read: hanya block yang memuat crop & rentang waktu ini yang di-decode
+archive = ArchiveReader('outputs/sensor_archive.sfa')
+first_day = df_cleaned['timestamp'].min() + timedelta(days=1)
+sample = archive.read(end=first_day, crops=['Wheat'], columns=['timestamp', 'MOI', 'temp', 'humidity'])
+print(f"   Range read (Wheat, hari pertama): {len(sample)} baris dari {len(archive.blocks)} block")
+
+# %% [markdown]
+# ## 7. Alerting Rule Engine
+# Evaluasi rule threshold & rate-of-change per crop dan Seedling Stage secara incremental (replay data bersih)
+
+# %%
+print("\n" + "=" * 60)
+print("🚨 ALERTING RULE ENGINE")
+print("=" * 60)
+
+alert_rules = load_rules('data/alert_rules.csv')
+alert_engine = AlertEngine(alert_rules)
+alerts_df = alerts_to_frame(alert_engine.process_frame(df_cleaned))
+
+print(f"Rule aktif: {len(alert_rules)} | Alert terpicu: {len(alerts_df)}")
+print(alerts_df.groupby('rule').size().rename('jumlah_alert').to_string())
+
+alerts_df.to_csv('outputs/alerts.csv', index=False)
+print(f"✅ Daftar alert disimpan ke outputs/alerts.csv")
+
 # %%
 print("\n" + "=" * 60)
 print("🎉 SELESAI! Semua output telah disimpan.")
@@ -382,6 +473,12 @@ print("""
 File yang dihasilkan:
 ├── outputs/
 │   ├── cleaned_data.csv
+│   ├── imputation_fill_table.csv
+│   ├── imputation_report.csv
+│   ├── stuck_sensor_report.csv
+│   ├── sensor_archive.sfa
+│   ├── alerts.csv
+│   ├── histogram_counts.csv
 │   ├── eda_distributions.png
 │   ├── correlation_heatmap.png
 │   ├── timeseries_trend.png
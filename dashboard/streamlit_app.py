@@ -13,6 +13,12 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
 import os
+import sys
+
+# Modul pipeline bersama (smart_farming/) ada di root repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from smart_farming.sensor_checks import WindowDeduplicator, StuckSensorDetector
+from smart_farming.histogram import compute_histograms, plot_histogram
 
 # Force white background on all matplotlib charts (agar tidak transparan di dark mode)
 plt.rcParams['figure.facecolor'] = 'white'
@@ -87,7 +93,23 @@ def load_data():
     
     return df
 
+@st.cache_data
+def load_histograms():
+    """Load hitungan histogram bin tetap dari output pipeline (atau hitung dari data)"""
+    possible_paths = [
+        'outputs/histogram_counts.csv',
+        '../outputs/histogram_counts.csv',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'outputs', 'histogram_counts.csv')
+    ]
+    
+    for path in possible_paths:
+        if os.path.exists(path):
+            return pd.read_csv(path)
+    
+    return compute_histograms(load_data())
+
 df = load_data()
+histogram_counts = load_histograms()
 
 # =============================================================================
 # SIDEBAR
@@ -109,12 +131,16 @@ selected_stage = st.sidebar.selectbox("📊 Pilih Growth Stage:", stage_options)
 
 # Apply filters
 df_filtered = df.copy()
+hist_filters = {}
 if selected_crop != 'Semua':
     df_filtered = df_filtered[df_filtered['crop ID'] == selected_crop]
+    hist_filters['crop ID'] = selected_crop
 if selected_soil != 'Semua':
     df_filtered = df_filtered[df_filtered['soil_type'] == selected_soil]
+    hist_filters['soil_type'] = selected_soil
 if selected_stage != 'Semua':
     df_filtered = df_filtered[df_filtered['Seedling Stage'] == selected_stage]
+    hist_filters['Seedling Stage'] = selected_stage
 
 st.sidebar.markdown("---")
 st.sidebar.markdown(f"**Data ditampilkan:** {len(df_filtered):,} baris")
@@ -160,11 +186,12 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 # Tab 1: Distribusi
 with tab1:
     st.subheader("📈 Distribusi Data Sensor")
+    # Histogram digambar dari hitungan bin tetap (sama dengan EDA di pipeline)
     col1, col2 = st.columns(2)
     
     with col1:
         fig, ax = plt.subplots(figsize=(8, 5), facecolor='white')
-        ax.hist(df_filtered['temp'], bins=25, color='#FF6B6B', edgecolor='black', alpha=0.7)
+        plot_histogram(ax, histogram_counts, 'temp', hist_filters, color='#FF6B6B', edgecolor='black', alpha=0.7)
         ax.set_title('Distribusi Temperature (°C)', fontweight='bold')
         ax.set_xlabel('Temperature')
         ax.set_ylabel('Frekuensi')
@@ -173,7 +200,7 @@ with tab1:
     
     with col2:
         fig, ax = plt.subplots(figsize=(8, 5), facecolor='white')
-        ax.hist(df_filtered['humidity'], bins=25, color='#4ECDC4', edgecolor='black', alpha=0.7)
+        plot_histogram(ax, histogram_counts, 'humidity', hist_filters, color='#4ECDC4', edgecolor='black', alpha=0.7)
         ax.set_title('Distribusi Humidity (%)', fontweight='bold')
         ax.set_xlabel('Humidity')
         ax.set_ylabel('Frekuensi')
@@ -184,7 +211,7 @@ with tab1:
     
     with col3:
         fig, ax = plt.subplots(figsize=(8, 5))
-        ax.hist(df_filtered['MOI'], bins=25, color='#45B7D1', edgecolor='black', alpha=0.7)
+        plot_histogram(ax, histogram_counts, 'MOI', hist_filters, color='#45B7D1', edgecolor='black', alpha=0.7)
         ax.set_title('Distribusi MOI', fontweight='bold')
         ax.set_xlabel('MOI')
         ax.set_ylabel('Frekuensi')
@@ -312,9 +339,16 @@ with tab5:
     recent_data = df[df['timestamp'] >= thirty_days_ago].shape[0] if 'timestamp' in df.columns else total_rows
     timeliness = recent_data / total_rows
     
-    overall = (accuracy + completeness + timeliness) / 3
+    # Uniqueness & Sensor Health (duplikat dan sensor macet)
+    duplicate_count = int(WindowDeduplicator(window='1D').check(df).sum())
+    stuck_detector = StuckSensorDetector(min_run=4)
+    stuck_count = int((stuck_detector.update(df) >= stuck_detector.min_run).sum())
+    uniqueness = 1 - (duplicate_count / total_rows)
+    sensor_health = 1 - (stuck_count / total_rows)
+    
+    overall = (accuracy + completeness + timeliness + uniqueness + sensor_health) / 5
     
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
     
     with col1:
         st.metric("🎯 Accuracy", f"{accuracy*100:.1f}%")
@@ -326,14 +360,21 @@ with tab5:
         st.metric("⏱️ Timeliness", f"{timeliness*100:.1f}%")
         st.caption(f"Data 30 hari terakhir")
     with col4:
+        st.metric("🧬 Uniqueness", f"{uniqueness*100:.1f}%")
+        st.caption(f"1 - ({duplicate_count}/{total_rows}) duplikat")
+    with col5:
+        st.metric("📡 Sensor Health", f"{sensor_health*100:.1f}%")
+        st.caption(f"1 - ({stuck_count}/{total_rows}) sensor macet")
+    with col6:
         st.metric("⭐ Overall Score", f"{overall*100:.1f}%")
-        st.caption("Rata-rata 3 metrik")
+        st.caption("Rata-rata 5 metrik")
     
     # Bar chart
     fig, ax = plt.subplots(figsize=(8, 5), facecolor='white')
-    scores = [accuracy * 100, completeness * 100, timeliness * 100, overall * 100]
-    labels = ['Accuracy', 'Completeness', 'Timeliness', 'Overall']
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4']
+    scores = [accuracy * 100, completeness * 100, timeliness * 100,
+              uniqueness * 100, sensor_health * 100, overall * 100]
+    labels = ['Accuracy', 'Completeness', 'Timeliness', 'Uniqueness', 'Sensor Health', 'Overall']
+    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFEAA7', '#DDA0DD', '#96CEB4']
     bars = ax.barh(labels, scores, color=colors, edgecolor='black', height=0.6)
     
     for bar, score in zip(bars, scores):
@@ -357,6 +398,8 @@ with tab5:
     | **Accuracy** | 1 - (missing/total) | Seberapa akurat data (minim missing) |
     | **Completeness** | non-null/total | Seberapa lengkap data terisi |
     | **Timeliness** | % data 30 hari terakhir | Seberapa baru/terkini datanya |
+    | **Uniqueness** | 1 - (duplikat/total) | Baris yang dikirim ulang oleh gateway |
+    | **Sensor Health** | 1 - (sensor macet/total) | Pembacaan identik berurutan (≥ 4) per crop |
     """)
 
 # =============================================================================
@@ -0,0 +1,8 @@
+# =============================================================================
+# SMART FARMING - MODUL PIPELINE BERSAMA
+# =============================================================================
+# Dipakai oleh Data_Lifecycle_Smart_Farming.py dan dashboard/streamlit_app.py
+# =============================================================================
+
+SENSOR_COLS = ['MOI', 'temp', 'humidity']
+GROUP_COLS = ['crop ID', 'Seedling Stage']
@@ -0,0 +1,425 @@
+# =============================================================================
+# ARSIP TIME-SERIES TERKOMPRESI (DELTA / BIT-PACKING / RLE)
+# =============================================================================
+# Format file (.sfa):
+#   [payload block 0][payload block 1]...[footer JSON][uint64 panjang footer][MAGIC]
+#
+# Setiap block (default 4096 baris) menyimpan tiap kolom secara terpisah:
+#   - timestamp  : origin + interval jika interval tetap, selain itu delta-of-delta
+#   - numerik    : delta antar baris, zigzag, lalu bit-packing selebar delta terbesar
+#                  (float diskalakan 10^d dulu jika desimalnya <= 3 digit)
+#   - kategorikal: kode dictionary di-run-length-encode (nilai run + panjang run)
+# Footer berisi schema, dictionary kategorikal, dan index block (rentang waktu
+# dan crop per block) sehingga pembacaan range hanya men-decode block yang perlu.
+# =============================================================================
+
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'SFA1'
+_TRAILER = struct.Struct('<Q4s')
+_MAX_SCALE_DIGITS = 3
+_MAX_SCALED = 2 ** 62  # batas aman int64 untuk float yang diskalakan
+
+
+# -----------------------------------------------------------------------------
+# Primitive encoding
+# -----------------------------------------------------------------------------
+def _zigzag(x):
+    x = x.astype(np.int64)
+    return ((x << 1) ^ (x >> 63)).astype(np.uint64)
+
+
+def _unzigzag(z):
+    z = z.astype(np.uint64)
+    return ((z >> np.uint64(1)).astype(np.int64) ^ -(z & np.uint64(1)).astype(np.int64))
+
+
+def _bit_width(values):
+    top = int(values.max()) if len(values) else 0
+    return top.bit_length()
+
+
+def _pack(values, width):
+    """Bit-pack array uint64 dengan lebar `width` bit per nilai"""
+    if width == 0 or len(values) == 0:
+        return b''
+    shifts = np.arange(width, dtype=np.uint64)
+    bits = ((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little').tobytes()
+
+
+def _unpack(buf, width, n):
+    if width == 0:
+        return np.zeros(n, dtype=np.uint64)
+    bits = np.unpackbits(np.frombuffer(buf, dtype=np.uint8), count=n * width, bitorder='little')
+    weights = np.uint64(1) << np.arange(width, dtype=np.uint64)
+    return (bits.reshape(n, width).astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+def _encode_deltas(values):
+    """Delta + zigzag + bit-packing. Return (params, bytes)"""
+    if len(values) == 0:
+        return {'first': 0, 'width': 0}, b''
+    deltas = _zigzag(np.diff(values))
+    width = _bit_width(deltas)
+    return {'first': int(values[0]), 'width': width}, _pack(deltas, width)
+
+
+def _decode_deltas(params, buf, n):
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    deltas = _unzigzag(_unpack(buf, params['width'], n - 1))
+    return np.concatenate([[params['first']], params['first'] + np.cumsum(deltas)]).astype(np.int64)
+
+
+# -----------------------------------------------------------------------------
+# Encoding per jenis kolom
+# -----------------------------------------------------------------------------
+def _encode_time(values):
+    ns = values.astype('datetime64[ns]').view(np.int64)
+    diffs = np.diff(ns)
+    if len(diffs) == 0 or (diffs == diffs[0]).all():
+        interval = int(diffs[0]) if len(diffs) else 0
+        return {'mode': 'interval', 'origin': int(ns[0]), 'interval': interval}, b''
+    # Delta-of-delta: timestamp hampir periodik -> sebagian besar bernilai 0
+    params, buf = _encode_deltas(diffs)
+    params.update(mode='dod', origin=int(ns[0]))
+    return params, buf
+
+
+def _decode_time(params, buf, n, dtype='datetime64[ns]'):
+    if params['mode'] == 'interval':
+        ns = params['origin'] + params['interval'] * np.arange(n, dtype=np.int64)
+    else:
+        diffs = _decode_deltas(params, buf, n - 1)
+        ns = np.concatenate([[params['origin']], params['origin'] + np.cumsum(diffs)]).astype(np.int64)
+    ns = ns.view('datetime64[ns]')
+    # Kembalikan unit & timezone asli (mis. datetime64[us], datetime64[ns, UTC]) sesuai schema
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return pd.DatetimeIndex(ns).tz_localize('UTC').tz_convert(dtype.tz).as_unit(dtype.unit).array
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        return ns.astype(dtype)
+    return ns
+
+
+def _encode_numeric(values):
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        params, buf = _encode_deltas(values.astype(np.int64))
+        params.update(mode='delta', scale=0)
+        return params, buf
+    # Jalur skala hanya untuk nilai hingga yang muat di int64; NaN/inf/nilai besar -> raw
+    if np.isfinite(values).all():
+        for digits in range(_MAX_SCALE_DIGITS + 1):
+            scaled = np.round(values * 10 ** digits)
+            if len(scaled) and np.abs(scaled).max() >= _MAX_SCALED:
+                break
+            if np.allclose(scaled / 10 ** digits, values, rtol=0, atol=1e-9):
+                params, buf = _encode_deltas(scaled.astype(np.int64))
+                params.update(mode='delta', scale=digits)
+                return params, buf
+    return {'mode': 'raw'}, values.astype(np.float64).tobytes()
+
+
+def _numeric_values(series):
+    """Array numpy untuk encoding; extension dtype (Int64, boolean, ...) -> NaN untuk NA"""
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        if series.isna().any():
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return series.to_numpy(dtype=series.dtype.numpy_dtype)
+    return series.to_numpy()
+
+
+def _decode_numeric(params, buf, n, dtype):
+    if params['mode'] == 'raw':
+        values = np.frombuffer(buf, dtype=np.float64, count=n)
+    else:
+        values = _decode_deltas(params, buf, n)
+        if params['scale']:
+            values = values / 10 ** params['scale']
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        # NaN dari writer kembali menjadi pd.NA pada Int64/Float64/boolean
+        return pd.array(values, dtype=dtype)
+    return values.astype(dtype)
+
+
+def _encode_codes(codes):
+    """Run-length encoding untuk kode dictionary (kode 0 = missing)"""
+    if len(codes) == 0:
+        return {'runs': 0, 'value_width': 0, 'length_width': 0}, b''
+    starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+    run_values = codes[starts].astype(np.uint64)
+    run_lengths = np.diff(np.append(starts, len(codes))).astype(np.uint64)
+    value_width, length_width = _bit_width(run_values), _bit_width(run_lengths)
+    buf = _pack(run_values, value_width) + _pack(run_lengths, length_width)
+    return {'runs': len(starts), 'value_width': value_width, 'length_width': length_width}, buf
+
+
+def _decode_codes(params, buf):
+    runs = params['runs']
+    split = (runs * params['value_width'] + 7) // 8
+    run_values = _unpack(buf[:split], params['value_width'], runs)
+    run_lengths = _unpack(buf[split:], params['length_width'], runs)
+    return np.repeat(run_values.astype(np.int64), run_lengths.astype(np.int64))
+
+
+# -----------------------------------------------------------------------------
+# Writer & Reader
+# -----------------------------------------------------------------------------
+class ArchiveWriter:
+    """Tulis DataFrame sensor ke arsip .sfa secara bertahap (append per chunk)"""
+
+    def __init__(self, path, time_col='timestamp', index_col='crop ID', block_size=4096):
+        self.path = path
+        self.time_col = time_col
+        self.index_col = index_col
+        self.block_size = block_size
+        self._file = open(path, 'wb')
+        self._schema = None
+        self._dictionaries = {}
+        self._blocks = []
+        self._pending = []
+        self._pending_rows = 0
+        self._rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _init_schema(self, df):
+        schema = []
+        for col in df.columns:
+            if col == self.time_col:
+                kind = 'time'
+            elif pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+                # bool disimpan sebagai 0/1 dan dikembalikan ke dtype schema saat decode
+                kind = 'numeric'
+            else:
+                kind = 'category'
+                self._dictionaries[col] = []
+            spec = {'name': col, 'kind': kind, 'dtype': str(df[col].dtype)}
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                # Kategori disimpan di schema agar dtype (termasuk urutan) bisa dipulihkan
+                categories = df[col].cat.categories
+                if pd.api.types.infer_dtype(categories) not in ('string', 'empty'):
+                    raise ValueError(f"Kolom '{col}': hanya kategori bertipe string yang didukung")
+                spec.update(categories=categories.tolist(), ordered=bool(df[col].cat.ordered))
+            schema.append(spec)
+        self._schema = schema
+
+    def _category_codes(self, col, values):
+        # Kode 0 dicadangkan untuk missing; dictionary bertambah saat ada nilai baru
+        dictionary = self._dictionaries[col]
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        lookup = {v: i for i, v in enumerate(dictionary)}
+        mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+        mapping[-1] = 0
+        for i, value in enumerate(uniques):
+            value = str(value)
+            if value not in lookup:
+                lookup[value] = len(dictionary)
+                dictionary.append(value)
+            mapping[i] = lookup[value] + 1
+        return mapping[codes]
+
+    def append(self, df):
+        if self._schema is None:
+            self._init_schema(df)
+        pos = 0
+        if self._pending_rows:
+            # Lengkapi block yang belum penuh dari append sebelumnya
+            pos = min(self.block_size - self._pending_rows, len(df))
+            self._pending.append(df.iloc[:pos])
+            self._pending_rows += pos
+            if self._pending_rows == self.block_size:
+                self._flush()
+        while len(df) - pos >= self.block_size:
+            self._write_block(df.iloc[pos:pos + self.block_size])
+            pos += self.block_size
+        if pos < len(df):
+            self._pending.append(df.iloc[pos:])
+            self._pending_rows += len(df) - pos
+
+    def _flush(self):
+        self._write_block(pd.concat(self._pending))
+        self._pending = []
+        self._pending_rows = 0
+
+    def _write_block(self, block):
+        meta = {'row_start': self._rows, 'n_rows': len(block), 'columns': {}}
+        times = None
+        if self.time_col in block.columns:
+            times = pd.to_datetime(block[self.time_col], cache=False)
+            if times.dt.tz is not None:
+                # Disimpan sebagai UTC naive; timezone dipulihkan dari schema saat decode
+                times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+            times = times.to_numpy().astype('datetime64[ns]')
+            meta['t_min'], meta['t_max'] = str(pd.Timestamp(times.min())), str(pd.Timestamp(times.max()))
+        for spec in self._schema:
+            col = spec['name']
+            if spec['kind'] == 'time':
+                params, buf = _encode_time(times)
+            elif spec['kind'] == 'numeric':
+                params, buf = _encode_numeric(_numeric_values(block[col]))
+            else:
+                codes = self._category_codes(col, block[col].to_numpy())
+                params, buf = _encode_codes(codes)
+                if col == self.index_col:
+                    meta['index_codes'] = sorted(int(c) for c in np.unique(codes))
+            params.update(offset=self._file.tell(), length=len(buf))
+            self._file.write(buf)
+            meta['columns'][col] = params
+        self._blocks.append(meta)
+        self._rows += len(block)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._pending_rows:
+            self._flush()
+        footer = json.dumps({
+            'time_col': self.time_col,
+            'index_col': self.index_col,
+            'schema': self._schema or [],
+            'dictionaries': self._dictionaries,
+            'blocks': self._blocks,
+        }).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(_TRAILER.pack(len(footer), MAGIC))
+        self._file.close()
+
+
+class ArchiveReader:
+    """Baca arsip .sfa: scan per block atau range read via index waktu & crop"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            f.seek(-_TRAILER.size, os.SEEK_END)
+            footer_len, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} bukan arsip sensor (.sfa) yang valid")
+            f.seek(-_TRAILER.size - footer_len, os.SEEK_END)
+            footer = json.loads(f.read(footer_len))
+        self.time_col = footer['time_col']
+        self.index_col = footer['index_col']
+        self.schema = footer['schema']
+        self.dictionaries = footer['dictionaries']
+        self._blocks = footer['blocks']
+        time_dtypes = [s['dtype'] for s in self.schema if s['kind'] == 'time']
+        time_dtype = pd.api.types.pandas_dtype(time_dtypes[0]) if time_dtypes else None
+        self._tz = time_dtype.tz if isinstance(time_dtype, pd.DatetimeTZDtype) else None
+
+    @property
+    def blocks(self):
+        """Index block sebagai DataFrame (rentang baris, waktu, dan crop)"""
+        index_dict = self.dictionaries.get(self.index_col, [])
+        return pd.DataFrame({
+            'row_start': [b['row_start'] for b in self._blocks],
+            'n_rows': [b['n_rows'] for b in self._blocks],
+            't_min': pd.to_datetime([b.get('t_min') for b in self._blocks]),
+            't_max': pd.to_datetime([b.get('t_max') for b in self._blocks]),
+            self.index_col: [[index_dict[c - 1] if c else None for c in b.get('index_codes', [])]
+                             for b in self._blocks],
+        })
+
+    def __len__(self):
+        return sum(b['n_rows'] for b in self._blocks)
+
+    def _bound(self, value):
+        """Batas waktu dengan timezone kolom waktu (waktu naive dianggap di timezone itu)"""
+        if value is None:
+            return None
+        value = pd.Timestamp(value)
+        if self._tz is not None and value.tz is None:
+            value = value.tz_localize(self._tz)
+        return value
+
+    def _select_blocks(self, start, end, crops):
+        # Index block menyimpan t_min/t_max sebagai UTC naive
+        start, end = (t.tz_convert('UTC').tz_localize(None) if t is not None and t.tz else t
+                      for t in (start, end))
+        selected = []
+        index_dict = self.dictionaries.get(self.index_col, [])
+        crop_codes = None
+        if crops is not None:
+            crop_codes = {index_dict.index(c) + 1 for c in crops if c in index_dict}
+        for i, block in enumerate(self._blocks):
+            if start is not None and 't_max' in block and pd.Timestamp(block['t_max']) < start:
+                continue
+            if end is not None and 't_min' in block and pd.Timestamp(block['t_min']) > end:
+                continue
+            if crop_codes is not None and not crop_codes.intersection(block.get('index_codes', [])):
+                continue
+            selected.append(i)
+        return selected
+
+    def _decode_block(self, f, block, columns):
+        n = block['n_rows']
+        data = {}
+        for spec in self.schema:
+            col = spec['name']
+            if col not in columns:
+                continue
+            params = block['columns'][col]
+            f.seek(params['offset'])
+            buf = f.read(params['length'])
+            if spec['kind'] == 'time':
+                data[col] = _decode_time(params, buf, n, spec['dtype'])
+            elif spec['kind'] == 'numeric':
+                data[col] = _decode_numeric(params, buf, n, spec['dtype'])
+            else:
+                dictionary = np.array([None] + self.dictionaries[col], dtype=object)
+                data[col] = dictionary[_decode_codes(params, buf)]
+                if 'categories' in spec:
+                    data[col] = pd.Categorical(data[col], categories=spec['categories'],
+                                               ordered=spec['ordered'])
+        return pd.DataFrame(data, index=pd.RangeIndex(block['row_start'], block['row_start'] + n))
+
+    def iter_blocks(self, start=None, end=None, crops=None, columns=None):
+        """Decode block demi block (hanya block yang lolos index waktu & crop)"""
+        start, end = self._bound(start), self._bound(end)
+        columns = set(columns or [s['name'] for s in self.schema])
+        # Kolom filter tetap di-decode agar baris bisa disaring dengan tepat
+        needed = columns | ({self.time_col} if start is not None or end is not None else set())
+        needed |= {self.index_col} if crops is not None else set()
+        with open(self.path, 'rb') as f:
+            for i in self._select_blocks(start, end, crops):
+                df = self._decode_block(f, self._blocks[i], needed)
+                mask = np.ones(len(df), dtype=bool)
+                if start is not None:
+                    mask &= (df[self.time_col] >= start).to_numpy()
+                if end is not None:
+                    mask &= (df[self.time_col] <= end).to_numpy()
+                if crops is not None:
+                    mask &= df[self.index_col].isin(list(crops)).to_numpy()
+                ordered = [s['name'] for s in self.schema if s['name'] in columns]
+                yield df.loc[mask, ordered]
+
+    def read(self, start=None, end=None, crops=None, columns=None):
+        """Baca rentang waktu / crop tertentu sebagai satu DataFrame"""
+        ordered = [s['name'] for s in self.schema if columns is None or s['name'] in columns]
+        parts = list(self.iter_blocks(start, end, crops, columns))
+        if not parts:
+            return pd.DataFrame(columns=ordered)
+        return pd.concat(parts)
+
+
+def write_archive(df, path, **kwargs):
+    """Tulis seluruh DataFrame ke arsip .sfa"""
+    with ArchiveWriter(path, **kwargs) as writer:
+        writer.append(df)
+
+
+def read_archive(path, **kwargs):
+    """Baca arsip .sfa (opsional: start, end, crops, columns)"""
+    return ArchiveReader(path).read(**kwargs)
@@ -0,0 +1,79 @@
+# =============================================================================
+# HISTOGRAM SENSOR DENGAN BIN TETAP (DIPAKAI PIPELINE & DASHBOARD)
+# =============================================================================
+# Bin edges tetap per kolom sensor, sehingga hitungan dari chunk berbeda dan
+# dari sel filter berbeda (crop ID, soil_type, Seedling Stage) bisa langsung
+# dijumlahkan. Saat render cukup menjumlahkan hitungan sel yang dipilih:
+# O(jumlah bin), tidak bergantung pada jumlah baris data.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_EDGES = {
+    'MOI': np.linspace(0, 100, 26),
+    'temp': np.linspace(0, 50, 26),
+    'humidity': np.linspace(0, 100, 26),
+}
+CELL_COLS = ['crop ID', 'soil_type', 'Seedling Stage']
+
+
+def compute_histograms(df, edges=HISTOGRAM_EDGES, cell_cols=CELL_COLS):
+    """Hitung histogram semua kolom sensor per sel filter dalam satu bincount.
+
+    Nilai di luar rentang edges masuk ke bin pertama/terakhir; NaN diabaikan.
+    Return DataFrame long: cell_cols + ['column', 'bin', 'count'] (hanya count > 0).
+    """
+    cell_cols = list(cell_cols)
+    grouped = df.groupby(cell_cols, sort=False, dropna=False)
+    cell_codes, cells = grouped.ngroup().to_numpy(), grouped.size().index
+    n_cells = len(cells)
+
+    # Index bin global: (kolom, sel, bin) -> satu bilangan bulat, lalu satu bincount
+    flat, offsets = [], {}
+    offset = 0
+    for col, col_edges in edges.items():
+        n_bins = len(col_edges) - 1
+        values = df[col].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        bins = np.clip(np.searchsorted(col_edges, values[valid], side='right') - 1, 0, n_bins - 1)
+        flat.append(offset + cell_codes[valid] * n_bins + bins)
+        offsets[col] = (offset, n_bins)
+        offset += n_cells * n_bins
+    counts = np.bincount(np.concatenate(flat), minlength=offset)
+
+    parts = []
+    for col, (start, n_bins) in offsets.items():
+        block = counts[start:start + n_cells * n_bins].reshape(n_cells, n_bins)
+        cell_idx, bin_idx = np.nonzero(block)
+        part = cells[cell_idx].to_frame(index=False)
+        part.columns = cell_cols
+        part['column'] = col
+        part['bin'] = bin_idx
+        part['count'] = block[cell_idx, bin_idx]
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)[cell_cols + ['column', 'bin', 'count']]
+
+
+def merge_histograms(histograms, cell_cols=CELL_COLS):
+    """Jumlahkan hitungan histogram dari beberapa chunk"""
+    merged = pd.concat(list(histograms), ignore_index=True)
+    return merged.groupby(list(cell_cols) + ['column', 'bin'], as_index=False, sort=False,
+                          dropna=False)['count'].sum()
+
+
+def select_histogram(histograms, column, filters=None, edges=HISTOGRAM_EDGES):
+    """Jumlahkan hitungan sel yang lolos filter ({kolom: nilai}). Return (edges, counts)"""
+    col_edges = edges[column]
+    selected = histograms[histograms['column'] == column]
+    for key, value in (filters or {}).items():
+        selected = selected[selected[key] == value]
+    counts = np.bincount(selected['bin'].to_numpy(dtype=int), weights=selected['count'].to_numpy(),
+                         minlength=len(col_edges) - 1)
+    return col_edges, counts
+
+
+def plot_histogram(ax, histograms, column, filters=None, edges=HISTOGRAM_EDGES, **kwargs):
+    """Gambar histogram dari hitungan yang sudah jadi (tanpa data mentah)"""
+    col_edges, counts = select_histogram(histograms, column, filters, edges)
+    return ax.hist(col_edges[:-1], bins=col_edges, weights=counts, **kwargs)
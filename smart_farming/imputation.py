@@ -0,0 +1,121 @@
+# =============================================================================
+# IMPUTASI MISSING VALUES PER GRUP (crop ID, Seedling Stage)
+# =============================================================================
+# Semua nilai pengisi dihitung dalam satu groupby (median untuk numerik,
+# mode untuk kategorikal) lalu diterapkan sekaligus dengan satu merge + fillna.
+# Fill table bisa disimpan ke CSV dan dipakai ulang untuk data streaming.
+# =============================================================================
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from smart_farming import GROUP_COLS
+
+
+@dataclass
+class FillTable:
+    """Nilai pengisi per grup + fallback global (untuk grup baru / key kosong)"""
+    group_cols: list
+    groups: pd.DataFrame      # index = group_cols, kolom = kolom yang diimputasi
+    global_values: pd.Series  # index = kolom yang diimputasi
+
+
+def _split_columns(df, group_cols):
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    cat_cols = [c for c in df.select_dtypes(exclude=[np.number, 'datetime']).columns
+                if c not in group_cols]
+    return numeric_cols, cat_cols
+
+
+def _group_mode(df, group_cols, col):
+    """Mode per grup tanpa loop: hitung frekuensi, ambil yang terbanyak per grup"""
+    counts = df.groupby(group_cols + [col], observed=True).size().reset_index(name='_n')
+    counts = counts.sort_values(group_cols + ['_n', col],
+                                ascending=[True] * len(group_cols) + [False, True])
+    return counts.drop_duplicates(group_cols).set_index(group_cols)[col]
+
+
+def build_fill_table(df, group_cols=GROUP_COLS):
+    """Hitung median (numerik) dan mode (kategorikal) per grup dalam satu pass"""
+    group_cols = list(group_cols)
+    numeric_cols, cat_cols = _split_columns(df, group_cols)
+
+    groups = df.groupby(group_cols, observed=True)[numeric_cols].median()
+    for col in cat_cols:
+        groups[col] = _group_mode(df, group_cols, col)
+
+    global_values = pd.Series(
+        {**df[numeric_cols].median().to_dict(),
+         **{col: df[col].mode().iloc[0] if df[col].notna().any() else np.nan
+            for col in cat_cols + group_cols}},
+        dtype=object,
+    )
+    return FillTable(group_cols=group_cols, groups=groups, global_values=global_values)
+
+
+def impute(df, table):
+    """Isi missing values memakai fill table.
+
+    Returns:
+        (df_filled, report) - report berisi jumlah sel yang diisi
+        per grup dan kolom (kolom: group_cols + ['column', 'n_imputed']).
+    """
+    keys = table.group_cols
+    cols = [c for c in table.global_values.index if c in df.columns]
+    mask = df[cols].isna()
+    missing_cols = mask.columns[mask.any()].tolist()
+
+    df_filled = df.copy()
+    if missing_cols:
+        # Nilai pengisi per baris: lookup grup (merge), fallback ke nilai global
+        group_fill_cols = [c for c in missing_cols if c in table.groups.columns]
+        fills = df[keys].merge(table.groups[group_fill_cols].reset_index(),
+                               on=keys, how='left')
+        fills.index = df.index
+        for col in missing_cols:
+            fallback = table.global_values[col]
+            if col in group_fill_cols:
+                fill = fills[col].where(fills[col].notna(), fallback)
+            else:
+                fill = fallback
+            df_filled[col] = df[col].fillna(fill)
+
+    report = (mask.groupby([df[k] for k in keys], dropna=False).sum()
+              .rename_axis(columns='column').stack().rename('n_imputed').reset_index())
+    report = report[report['n_imputed'] > 0].reset_index(drop=True)
+    return df_filled, report
+
+
+def impute_stream(chunks, table):
+    """Imputasi chunk demi chunk dengan fill table yang sudah dihitung sebelumnya"""
+    for chunk in chunks:
+        yield impute(chunk, table)
+
+
+def merge_reports(reports):
+    """Gabungkan beberapa report imputasi (mis. dari impute_stream)"""
+    reports = [r for r in reports if len(r)]
+    if not reports:
+        return pd.DataFrame(columns=GROUP_COLS + ['column', 'n_imputed'])
+    report = pd.concat(reports, ignore_index=True)
+    keys = [c for c in report.columns if c != 'n_imputed']
+    return report.groupby(keys, dropna=False, as_index=False)['n_imputed'].sum()
+
+
+def save_fill_table(table, path):
+    """Simpan fill table ke CSV (kolom 'scope': group / global)"""
+    groups = table.groups.reset_index().assign(scope='group')
+    global_row = pd.DataFrame([table.global_values]).assign(scope='global')
+    pd.concat([groups, global_row], ignore_index=True).to_csv(path, index=False)
+
+
+def load_fill_table(path, group_cols=GROUP_COLS):
+    """Baca fill table dari CSV hasil save_fill_table"""
+    group_cols = list(group_cols)
+    raw = pd.read_csv(path)
+    is_global = raw['scope'] == 'global'
+    groups = raw[~is_global].drop(columns='scope').set_index(group_cols)
+    global_values = raw[is_global].drop(columns='scope').iloc[0].astype(object)
+    return FillTable(group_cols=group_cols, groups=groups, global_values=global_values)
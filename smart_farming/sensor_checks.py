@@ -0,0 +1,161 @@
+# =============================================================================
+# DETEKSI DUPLIKAT & SENSOR MACET (STREAMING)
+# =============================================================================
+# - Duplikat: hash tiap baris (hash_pandas_object), dicek ke seen-set yang
+#   dibatasi time window, atau ke Bloom filter (memori tetap untuk stream
+#   tanpa batas).
+# - Sensor macet: run-length encoding nilai MOI/temp/humidity yang identik
+#   berurutan per stream crop. Dihitung per chunk dengan groupby.shift (tanpa
+#   sort seluruh dataset); state akhir tiap stream dibawa ke chunk berikutnya.
+# =============================================================================
+
+import numpy as np
+import pandas as pd
+
+from smart_farming import SENSOR_COLS
+
+
+def row_hashes(df, cols=None):
+    """Hash 64-bit per baris (vectorized)"""
+    cols = list(df.columns) if cols is None else list(cols)
+    return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+
+
+class WindowDeduplicator:
+    """Seen-set hash baris yang hanya menyimpan baris dalam `window` terakhir.
+
+    Baris duplikat = hash yang sama muncul lagi paling lama `window` setelah
+    kemunculan sebelumnya. `key_cols=None` memakai semua kolom kecuali
+    `time_col` (timestamp hanya dipakai untuk window, bukan identitas baris).
+    """
+
+    def __init__(self, window, time_col='timestamp', key_cols=None):
+        self.window = pd.Timedelta(window)
+        self.time_col = time_col
+        self.key_cols = key_cols
+        self._seen = pd.Series(dtype='datetime64[ns]', index=pd.Index([], dtype='uint64'))
+
+    def __len__(self):
+        return len(self._seen)
+
+    def check(self, chunk):
+        """Return mask boolean: True = baris duplikat (sudah terlihat dalam window)"""
+        if chunk.empty:
+            return np.zeros(0, dtype=bool)
+        key_cols = self.key_cols
+        if key_cols is None:
+            key_cols = [c for c in chunk.columns if c != self.time_col]
+        hashes = row_hashes(chunk, key_cols)
+        times = pd.Series(pd.to_datetime(chunk[self.time_col]).to_numpy())
+
+        # Kemunculan sebelumnya tiap hash: di dalam chunk via groupby.shift,
+        # untuk kemunculan pertama di chunk diambil dari seen-set chunk lalu
+        prev = times.groupby(hashes, sort=False).shift()
+        first = prev.isna().to_numpy()
+        prev = prev.to_numpy(copy=True)
+        prev[first] = self._seen.reindex(hashes[first]).to_numpy()
+        dup = prev >= (times - self.window).to_numpy()
+
+        # Simpan waktu kemunculan terakhir tiap hash, lalu buang yang keluar window
+        latest = times.groupby(hashes, sort=False).max()
+        latest.index = latest.index.astype('uint64')
+        seen = pd.concat([self._seen[~self._seen.index.isin(latest.index)], latest])
+        self._seen = seen[seen >= times.max() - self.window]
+        return dup
+
+
+class BloomDeduplicator:
+    """Bloom filter di atas hash baris: memori tetap, false positive ~error_rate.
+
+    Bit disimpan terpaket 8 per byte. Seperti WindowDeduplicator,
+    `key_cols=None` memakai semua kolom kecuali `time_col`.
+    """
+
+    def __init__(self, capacity, error_rate=0.001, time_col='timestamp', key_cols=None):
+        self.n_bits = int(np.ceil(-capacity * np.log(error_rate) / np.log(2) ** 2))
+        self.n_hashes = max(1, int(round(self.n_bits / capacity * np.log(2))))
+        self.time_col = time_col
+        self.key_cols = key_cols
+        self._bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes):
+        # Double hashing: posisi ke-i = h1 + i * h2 (mod n_bits)
+        h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.n_hashes, dtype=np.uint64)
+        return ((h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.n_bits)).astype(np.int64)
+
+    def check(self, chunk):
+        """Return mask boolean: True = baris (kemungkinan) duplikat"""
+        if chunk.empty:
+            return np.zeros(0, dtype=bool)
+        key_cols = self.key_cols
+        if key_cols is None:
+            key_cols = [c for c in chunk.columns if c != self.time_col]
+        hashes = row_hashes(chunk, key_cols)
+        pos = self._positions(hashes)
+        byte, mask = pos >> 3, (1 << (pos & 7)).astype(np.uint8)
+        present = (self._bits[byte] & mask) != 0
+        dup = present.all(axis=1) | pd.Series(hashes).duplicated().to_numpy()
+        np.bitwise_or.at(self._bits, byte[~dup].ravel(), mask[~dup].ravel())
+        return dup
+
+
+class StuckSensorDetector:
+    """Deteksi run nilai sensor identik berurutan per stream (default per crop ID)"""
+
+    def __init__(self, min_run=4, group_cols=('crop ID',), value_cols=SENSOR_COLS):
+        self.min_run = min_run
+        self.group_cols = list(group_cols)
+        self.value_cols = list(value_cols)
+        # State per stream: nilai terakhir + panjang run terakhir
+        self._state = pd.DataFrame(columns=self.group_cols + self.value_cols + ['run_length'])
+        self._summary = pd.DataFrame(columns=self.group_cols + ['stuck_rows', 'longest_run'])
+
+    def update(self, chunk):
+        """Return Series panjang run (termasuk baris itu) untuk tiap baris chunk"""
+        keys, cols = self.group_cols, self.value_cols
+        if chunk.empty:
+            return pd.Series(dtype='int64', index=chunk.index)
+        grouped = chunk.groupby(keys, sort=False)
+
+        # Nilai sebelumnya per stream; baris pertama tiap stream diambil dari state
+        prev = grouped[cols].shift()
+        carried = chunk[keys].merge(self._state, on=keys, how='left')
+        carried.index = chunk.index
+        is_first = grouped.cumcount() == 0
+        prev.loc[is_first] = carried.loc[is_first, cols].to_numpy()
+
+        same = (chunk[cols] == prev).all(axis=1)
+        run_id = (~same).astype(int).groupby([chunk[k] for k in keys], sort=False).cumsum()
+        run_length = chunk.groupby(keys + [run_id.rename('_run')], sort=False).cumcount() + 1
+        carry = carried['run_length'].fillna(0).astype(int)
+        run_length = (run_length + carry.where(run_id == 0, 0)).rename('run_length')
+
+        # Update state & ringkasan
+        last = chunk[keys + cols].assign(run_length=run_length).groupby(keys, sort=False).tail(1)
+        self._state = pd.concat([self._state, last]).drop_duplicates(keys, keep='last')
+        stuck = run_length >= self.min_run
+        summary = (pd.DataFrame({'stuck_rows': stuck.astype(int), 'longest_run': run_length})
+                   .groupby([chunk[k] for k in keys], sort=False)
+                   .agg({'stuck_rows': 'sum', 'longest_run': 'max'}).reset_index())
+        self._summary = (pd.concat([self._summary, summary])
+                         .groupby(keys, sort=False, as_index=False)
+                         .agg({'stuck_rows': 'sum', 'longest_run': 'max'}))
+        return run_length
+
+    def summary(self):
+        """Ringkasan per stream: jumlah baris macet dan run terpanjang"""
+        return self._summary.astype({'stuck_rows': int, 'longest_run': int})
+
+
+def run_sensor_checks(chunks, deduplicator, stuck_detector):
+    """Jalankan deduplikasi + deteksi sensor macet per chunk.
+
+    Yields:
+        (chunk_bersih, n_duplikat, run_length) - chunk tanpa baris duplikat.
+    """
+    for chunk in chunks:
+        dup = deduplicator.check(chunk)
+        clean = chunk[~dup]
+        yield clean, int(dup.sum()), stuck_detector.update(clean)
@@ -0,0 +1,148 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smart_farming import GROUP_COLS
+from smart_farming.alerts import AlertEngine, Rule, alerts_to_frame, load_rules, replay
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = ROOT / 'data' / 'raw' / 'smart_farming_sensor_data.csv'
+
+# Semua stat x kedua op, window berbeda, rule global & rule yang dibatasi crop / stage.
+# Threshold sengaja tidak bulat agar tidak ada nilai yang tepat sama dengan threshold.
+RULES = [
+    Rule('moi value >', 'MOI', 'value', '>', 90.5),
+    Rule('moi value <', 'MOI', 'value', '<', 5.5, crop='Wheat'),
+    Rule('moi min <', 'MOI', 'min', '<', 3.5, window='2h'),
+    Rule('moi min >', 'MOI', 'min', '>', 60.5, window='45min'),
+    Rule('moi max >', 'MOI', 'max', '>', 97.5, window='3h', stage='Flowering'),
+    Rule('moi max <', 'MOI', 'max', '<', 15.5, window='1h'),
+    Rule('moi mean <', 'MOI', 'mean', '<', 10.37, window='1h'),
+    Rule('moi mean <<', 'MOI', 'mean', '<', 20.37, window='1h'),
+    Rule('moi mean >', 'MOI', 'mean', '>', 80.37, window='2h', crop='Tomato'),
+    Rule('moi rate <', 'MOI', 'rate', '<', -20.3, window='1h'),
+    Rule('moi rate >', 'MOI', 'rate', '>', 3.7, window='90min'),
+    Rule('temp value >', 'temp', 'value', '>', 44.5, stage='Germination'),
+    Rule('temp max >', 'temp', 'max', '>', 40.5, window='30min'),
+    Rule('temp mean >', 'temp', 'mean', '>', 38.13, window='1h', crop='Wheat', stage='Flowering'),
+    Rule('temp min <', 'temp', 'min', '<', 14.5, window='2h'),
+    Rule('temp rate >', 'temp', 'rate', '>', 8.7, window='1h', crop='Chilli'),
+    Rule('humidity min <', 'humidity', 'min', '<', 25.5, window='2h', crop='Wheat'),
+    Rule('humidity mean >', 'humidity', 'mean', '>', 85.21, window='4h'),
+    Rule('humidity rate >', 'humidity', 'rate', '>', 15.1, window='1h', crop='Tomato'),
+    Rule('humidity rate <', 'humidity', 'rate', '<', -10.1, window='2h'),
+]
+
+
+@pytest.fixture(scope='module')
+def sensor_df():
+    """Replay dataset mentah dengan timestamp sintetis 15 menit, seperti pipeline"""
+    df = pd.read_csv(DATA)
+    df['timestamp'] = pd.date_range('2024-01-01', periods=len(df), freq='15min')
+    df['device'] = np.arange(len(df)) % 3
+    return df
+
+
+def rolling_stat(series, rule):
+    """Nilai stat rule per baris, window waktu (t - window, t]"""
+    if rule.stat == 'value':
+        return series
+    if rule.stat != 'rate':
+        return getattr(series.rolling(rule.window), rule.stat)()
+    # rate: perubahan per jam dari pembacaan tertua di window ke pembacaan terbaru
+    t = series.index.as_unit('ns').asi8
+    first = np.searchsorted(t, t - rule.window.value, side='right')
+    dt = (t - t[first]) / 3.6e12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (series.to_numpy() - series.to_numpy()[first]) / dt
+    return pd.Series(np.where(dt > 0, rate, np.nan), index=series.index)
+
+
+def brute_force(df, rules, key_cols):
+    """Referensi: rolling pandas per stream lalu deteksi rising edge per rule"""
+    rows = []
+    for key, stream in df.groupby(key_cols, sort=False):
+        scope = dict(zip(key_cols, key))
+        stream = stream.set_index('timestamp')
+        for rule in rules:
+            if not rule.matches((scope.get('crop ID'), scope.get('Seedling Stage'))):
+                continue
+            value = rolling_stat(stream[rule.column].astype(float), rule)
+            firing = value > rule.threshold if rule.op == '>' else value < rule.threshold
+            rising = firing & ~firing.shift(fill_value=False)
+            for t, v in value[rising].items():
+                rows.append((t, rule.name, *key, rule.column, rule.stat, v, rule.threshold))
+    columns = ['timestamp', 'rule'] + list(key_cols) + ['column', 'stat', 'value', 'threshold']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def normalized(alerts, key_cols):
+    alerts = alerts.astype({'value': float, 'threshold': float})
+    return alerts.sort_values(['timestamp', 'rule'] + list(key_cols)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('key_cols', [
+    GROUP_COLS,
+    ['Seedling Stage', 'crop ID'],
+    ['device', 'crop ID', 'Seedling Stage'],
+], ids=['crop-stage', 'reordered', 'device'])
+def test_engine_matches_brute_force(sensor_df, key_cols):
+    engine = AlertEngine(RULES, key_cols=key_cols)
+    result = normalized(alerts_to_frame(engine.process_frame(sensor_df), key_cols), key_cols)
+    expected = normalized(brute_force(sensor_df, RULES, key_cols), key_cols)
+
+    assert len(expected) > 0
+    assert set(expected['rule']) == {rule.name for rule in RULES}
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_shipped_rules_match_brute_force(sensor_df):
+    rules = load_rules(ROOT / 'data' / 'alert_rules.csv')
+    result = alerts_to_frame(AlertEngine(rules).process_frame(sensor_df))
+    expected = brute_force(sensor_df, rules, GROUP_COLS)
+    pd.testing.assert_frame_equal(normalized(result, GROUP_COLS), normalized(expected, GROUP_COLS),
+                                  check_dtype=False, rtol=1e-9)
+
+
+def test_replay_matches_process_frame(sensor_df):
+    df = sensor_df.head(2000)
+    expected = AlertEngine(RULES).process_frame(df)
+    assert list(replay(df, AlertEngine(RULES))) == expected
+
+
+def test_edge_triggered_rearms_after_condition_clears():
+    engine = AlertEngine([Rule('high', 'MOI', 'value', '>', 50)], key_cols=['crop ID'])
+    values = [60, 70, 40, 80, 90, 10, 55]
+    fired = [len(engine.process(('Wheat',), t * 10**9, {'MOI': v})) for t, v in enumerate(values)]
+    assert fired == [1, 0, 0, 1, 0, 0, 1]
+
+
+def test_thresholds_fire_as_prefix():
+    rules = [Rule(f'low {x}', 'MOI', 'value', '<', x) for x in (30, 10, 20)]
+    engine = AlertEngine(rules, key_cols=['crop ID'])
+    fired = [{a.rule for a in engine.process(('Wheat',), t, {'MOI': v})}
+             for t, v in enumerate([25, 15, 5, 25])]
+    assert fired == [{'low 30'}, {'low 20'}, {'low 10'}, set()]
+
+
+def test_nan_key_rows_share_one_stream(sensor_df):
+    df = sensor_df.head(200).copy()
+    df.loc[:49, 'crop ID'] = np.nan
+    engine = AlertEngine(RULES)
+    engine.process_frame(df)
+    n_streams = len(df.drop_duplicates(GROUP_COLS))
+    assert len(engine._streams) == n_streams
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'stat': 'median'}, 'stat'),
+    ({'op': '>='}, 'op'),
+    ({'window': '0s'}, 'window'),
+    ({'window': '-1h'}, 'window'),
+])
+def test_invalid_rule(kwargs, message):
+    spec = {**dict(name='z', column='MOI', stat='value', op='>', threshold=1), **kwargs}
+    with pytest.raises(ValueError, match=message):
+        Rule(**spec)
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from smart_farming.archive import (
+    ArchiveReader, ArchiveWriter, _pack, _unpack, _unzigzag, _zigzag, read_archive, write_archive,
+)
+
+CROPS = ['Wheat', 'Groundnut', 'Garden Flowers', 'Maize']
+
+
+def make_frame(n, seed=0, regular=True):
+    rng = np.random.default_rng(seed)
+    if regular:
+        timestamps = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(n) * 15, unit='min')
+    else:
+        # Interval tidak tetap (jitter + gap) -> jalur delta-of-delta
+        steps = rng.integers(1, 3600, size=n) * 10**9
+        timestamps = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.cumsum(steps), unit='ns')
+    return pd.DataFrame({
+        'timestamp': pd.DatetimeIndex(timestamps).as_unit('ns'),
+        'crop ID': rng.choice(CROPS, size=n),
+        'MOI': rng.integers(0, 100, size=n),
+        'temp': np.round(rng.uniform(10, 40, size=n), 2),
+        'humidity': rng.uniform(0, 100, size=n),
+        'result': rng.integers(0, 2, size=n).astype(bool),
+    })
+
+
+def assert_roundtrip(df, path, **kwargs):
+    write_archive(df, path, **kwargs)
+    pd.testing.assert_frame_equal(read_archive(path), df.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('values', [
+    np.array([0, 1, -1, 2**40, -(2**40), np.iinfo(np.int64).max, np.iinfo(np.int64).min]),
+    np.zeros(0, dtype=np.int64),
+])
+def test_zigzag_roundtrip(values):
+    np.testing.assert_array_equal(_unzigzag(_zigzag(values)), values)
+
+
+@pytest.mark.parametrize('width', [1, 3, 7, 8, 13, 33, 64])
+def test_pack_roundtrip(width):
+    rng = np.random.default_rng(width)
+    top = np.iinfo(np.uint64).max if width == 64 else (1 << width) - 1
+    values = rng.integers(0, top, size=101, dtype=np.uint64, endpoint=True)
+    np.testing.assert_array_equal(_unpack(_pack(values, width), width, len(values)), values)
+
+
+@pytest.mark.parametrize('column', [
+    pd.Series([3, 1, 4, 1, 5, 9, 2, 6], dtype='int64'),
+    pd.Series([3, 1, 4, 1, 5, 9, 2, 6], dtype='int32'),
+    pd.Series([0.5, 1.25, -3.125, 7.0, 0.0, 2.5, 1.0, 4.75]),
+    pd.Series([np.pi, np.e, 1 / 3, 2.0, np.nan, -1e300, 1e-300, 0.1]),
+    pd.Series([1.0, np.inf, 2.5, -np.inf, 0.0, 3.0, 4.0, 5.0]),
+    pd.Series([1.0, 1e300, -1e300, 2.0, 0.5, 3.0, 2.0**62, -(2.0**62)]),
+    pd.Series([1.5, 2.5, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0], dtype='float32'),
+    pd.Series([1, None, 3, 4, None, 6, 7, 8], dtype='Int64'),
+    pd.Series([1.5, None, 3, 4, 5, 6, 7, 8], dtype='Float64'),
+    pd.Series([True, False, False, True, True, True, False, True]),
+    pd.Series([True, None, False, True, True, None, False, True], dtype='boolean'),
+    pd.Series(['a', 'b', None, 'a', 'a', 'a', 'c', None]),
+    pd.Series(pd.Categorical(['b', 'a', None, 'a', 'b', 'b', 'a', 'a'],
+                             categories=['b', 'a', 'unused'], ordered=True)),
+], ids=['int64', 'int32', 'float-scaled', 'float-raw', 'float-inf', 'float-huge', 'float32',
+        'Int64', 'Float64', 'bool', 'boolean', 'str', 'category'])
+def test_dtype_roundtrip(tmp_path, column):
+    df = make_frame(len(column))
+    df['value'] = column
+    assert_roundtrip(df, tmp_path / 'data.sfa')
+
+
+@pytest.mark.parametrize('unit', ['s', 'ms', 'us', 'ns'])
+def test_time_unit_roundtrip(tmp_path, unit):
+    df = make_frame(50, regular=False)
+    df['timestamp'] = df['timestamp'].dt.as_unit(unit).dt.floor('s')
+    assert_roundtrip(df, tmp_path / 'data.sfa')
+
+
+@pytest.mark.parametrize('tz', ['UTC', 'Asia/Jakarta'])
+def test_tz_aware_time_roundtrip_and_range_read(tmp_path, tz):
+    df = make_frame(100, regular=False)
+    df['timestamp'] = df['timestamp'].dt.tz_localize(tz)
+    path = tmp_path / 'data.sfa'
+    assert_roundtrip(df, path, block_size=16)
+
+    start, end = df['timestamp'].iloc[[30, 60]]
+    pd.testing.assert_frame_equal(read_archive(path, start=start, end=end), df.iloc[30:61])
+    # Batas tanpa timezone dibaca dalam timezone kolom waktu
+    naive = read_archive(path, start=start.tz_localize(None), end=end.tz_localize(None))
+    pd.testing.assert_frame_equal(naive, df.iloc[30:61])
+
+
+def test_rejects_non_string_categories(tmp_path):
+    df = make_frame(4).assign(value=pd.Categorical([1, 2, 1, 2]))
+    with pytest.raises(ValueError):
+        write_archive(df, tmp_path / 'data.sfa')
+
+
+@pytest.mark.parametrize('regular', [True, False])
+@pytest.mark.parametrize('n', [1, 2, 15, 16, 17, 48, 50])
+def test_block_size_boundaries(tmp_path, n, regular):
+    df = make_frame(n, seed=n, regular=regular)
+    assert_roundtrip(df, tmp_path / 'data.sfa', block_size=16)
+    assert sum(ArchiveReader(tmp_path / 'data.sfa').blocks['n_rows']) == n
+
+
+@pytest.mark.parametrize('splits', [[5], [16], [3, 7, 30], [10, 10, 10], [1] * 40])
+def test_multi_append(tmp_path, splits):
+    df = make_frame(100, regular=False)
+    bounds = np.cumsum([0] + splits + [len(df) - sum(splits)])
+    path = tmp_path / 'data.sfa'
+    with ArchiveWriter(path, block_size=16) as writer:
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            writer.append(df.iloc[lo:hi])
+    reader = ArchiveReader(path)
+    assert (reader.blocks['n_rows'].iloc[:-1] == 16).all()
+    pd.testing.assert_frame_equal(reader.read(), df)
+
+
+@pytest.mark.parametrize('start, end, crops, columns', [
+    ('2024-01-01 10:00', None, None, None),
+    (None, '2024-01-02 03:07', None, None),
+    ('2024-01-01 05:00', '2024-01-01 09:59', None, ['timestamp', 'MOI']),
+    (None, None, ['Wheat'], None),
+    (None, None, ['Wheat', 'Maize'], ['MOI', 'temp']),
+    ('2024-01-01 12:00', '2024-01-02 00:00', ['Groundnut'], ['crop ID', 'humidity']),
+    (None, None, ['Rice'], None),
+    ('2030-01-01', None, None, None),
+])
+def test_range_read_matches_filter(tmp_path, start, end, crops, columns):
+    df = make_frame(200)
+    path = tmp_path / 'data.sfa'
+    write_archive(df, path, block_size=32)
+
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df['timestamp'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['timestamp'] <= pd.Timestamp(end)
+    if crops is not None:
+        mask &= df['crop ID'].isin(crops)
+    expected = df.loc[mask, columns or list(df.columns)]
+
+    result = read_archive(path, start=start, end=end, crops=crops, columns=columns)
+    assert list(result.columns) == list(expected.columns)
+    if expected.empty:
+        assert result.empty
+    else:
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_rejects_non_archive(tmp_path):
+    path = tmp_path / 'data.sfa'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        ArchiveReader(path)
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smart_farming import GROUP_COLS
+from smart_farming.imputation import (
+    build_fill_table, impute, impute_stream, load_fill_table, merge_reports, save_fill_table,
+)
+
+DATA = Path(__file__).resolve().parents[1] / 'data' / 'raw' / 'smart_farming_sensor_data.csv'
+FILL_COLS = ['soil_type', 'MOI', 'temp', 'humidity']
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return pd.read_csv(DATA)
+
+
+@pytest.fixture
+def holed(raw):
+    """Dataset dengan ~5% NaN di kolom sensor & soil_type, plus NaN di key grup"""
+    rng = np.random.default_rng(0)
+    df = raw.copy()
+    df['MOI'] = df['MOI'].astype(float)
+    for col in FILL_COLS:
+        df.loc[rng.random(len(df)) < 0.05, col] = np.nan
+    df.loc[rng.choice(len(df), 20, replace=False), 'crop ID'] = np.nan
+    return df
+
+
+def expected_group_fill(df, col):
+    """Referensi brute force: median / mode (tie -> nilai terkecil) per grup"""
+    known = df.dropna(subset=GROUP_COLS + [col])
+    if pd.api.types.is_numeric_dtype(df[col]):
+        return known.groupby(GROUP_COLS)[col].median()
+    return known.groupby(GROUP_COLS)[col].agg(
+        lambda s: s.value_counts().sort_index(kind='stable').idxmax())
+
+
+@pytest.mark.parametrize('col', FILL_COLS)
+def test_fills_with_group_value(holed, col):
+    filled, _ = impute(holed, build_fill_table(holed))
+    assert filled[col].notna().all()
+
+    rows = holed[col].isna() & holed['crop ID'].notna()
+    expected = expected_group_fill(holed, col)
+    keys = pd.MultiIndex.from_frame(holed.loc[rows, GROUP_COLS])
+    np.testing.assert_array_equal(filled.loc[rows, col].to_numpy(),
+                                  expected.reindex(keys).to_numpy())
+    # Sel yang tidak kosong tidak berubah
+    pd.testing.assert_series_equal(filled.loc[holed[col].notna(), col],
+                                   holed.loc[holed[col].notna(), col])
+
+
+def test_global_fallback_for_missing_key_and_unseen_group(holed):
+    table = build_fill_table(holed)
+    new = holed.head(3).copy()
+    new['crop ID'] = [np.nan, 'Rice', 'Rice']
+    new[['MOI', 'temp']] = np.nan
+    filled, _ = impute(new, table)
+
+    assert (filled['MOI'] == holed['MOI'].median()).all()
+    assert (filled['temp'] == holed['temp'].median()).all()
+    assert filled.loc[0, 'crop ID'] == holed['crop ID'].mode().iloc[0]
+    assert (filled.loc[1:, 'crop ID'] == 'Rice').all()
+
+
+def test_report_totals(holed):
+    table = build_fill_table(holed)
+    chunks = [holed.iloc[i:i + 3000] for i in range(0, len(holed), 3000)]
+    report = merge_reports(r for _, r in impute_stream(chunks, table))
+
+    totals = report.groupby('column')['n_imputed'].sum()
+    expected = holed.isna().sum()
+    assert totals.to_dict() == expected[expected > 0].to_dict()
+    _, single = impute(holed, table)
+    pd.testing.assert_frame_equal(
+        report.sort_values(list(report.columns)).reset_index(drop=True),
+        single.sort_values(list(single.columns)).reset_index(drop=True),
+        check_dtype=False)
+
+
+def test_merge_reports_empty():
+    assert list(merge_reports([])) == GROUP_COLS + ['column', 'n_imputed']
+
+
+@pytest.mark.parametrize('n_chunks', [1, 2, 7])
+def test_stream_with_reloaded_table_matches_single_pass(tmp_path, holed, n_chunks):
+    table = build_fill_table(holed)
+    path = tmp_path / 'fill_table.csv'
+    save_fill_table(table, path)
+    reloaded = load_fill_table(path)
+
+    single, _ = impute(holed, table)
+    bounds = np.linspace(0, len(holed), n_chunks + 1).astype(int)
+    chunks = [holed.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+    streamed = pd.concat(df for df, _ in impute_stream(chunks, reloaded))
+    pd.testing.assert_frame_equal(streamed, single)
+
+
+def test_fill_table_csv_roundtrip(tmp_path, holed):
+    table = build_fill_table(holed)
+    path = tmp_path / 'fill_table.csv'
+    save_fill_table(table, path)
+    reloaded = load_fill_table(path)
+
+    pd.testing.assert_frame_equal(reloaded.groups, table.groups, check_dtype=False)
+    for col, value in table.global_values.items():
+        assert reloaded.global_values[col] == value
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smart_farming.sensor_checks import (
+    BloomDeduplicator, StuckSensorDetector, WindowDeduplicator, run_sensor_checks,
+)
+
+DATA = Path(__file__).resolve().parents[1] / 'data' / 'raw' / 'smart_farming_sensor_data.csv'
+
+
+@pytest.fixture(scope='module')
+def sensor_df():
+    """Dataset mentah + timestamp sintetis 15 menit, seperti pipeline"""
+    df = pd.read_csv(DATA)
+    df['timestamp'] = pd.date_range('2024-01-01', periods=len(df), freq='15min')
+    return df
+
+
+def chunked(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def run_checks(df, chunk_size, window='1D'):
+    results = list(run_sensor_checks(chunked(df, chunk_size), WindowDeduplicator(window),
+                                     StuckSensorDetector(min_run=4)))
+    clean = pd.concat([chunk for chunk, _, _ in results])
+    run_length = pd.concat([rl for _, _, rl in results])
+    return clean, sum(n for _, n, _ in results), run_length
+
+
+@pytest.mark.parametrize('window', ['1D', '4D'])
+@pytest.mark.parametrize('chunk_size', [100, 1000, 5000])
+def test_results_do_not_depend_on_chunk_size(sensor_df, chunk_size, window):
+    expected_clean, expected_dup, expected_run = run_checks(sensor_df, len(sensor_df), window)
+    clean, n_dup, run_length = run_checks(sensor_df, chunk_size, window)
+    assert n_dup == expected_dup
+    pd.testing.assert_frame_equal(clean, expected_clean)
+    pd.testing.assert_series_equal(run_length, expected_run)
+
+
+def test_window_dedup_ignores_timestamp(sensor_df):
+    n_exact = int(sensor_df.drop(columns='timestamp').duplicated().sum())
+    assert n_exact > 0
+    # Window lebar: semua duplikat persis terdeteksi walau timestamp-nya unik
+    assert WindowDeduplicator('30D').check(sensor_df).sum() == n_exact
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 10])
+def test_window_dedup_respects_window_within_chunk(chunk_size):
+    times = pd.date_range('2024-01-01', periods=10, freq='12h')
+    df = pd.DataFrame({'v': 1, 'timestamp': times.where(times.day < 4, times + pd.Timedelta('2D'))})
+    dedup = WindowDeduplicator('1D', key_cols=['v'])
+    dup = np.concatenate([dedup.check(chunk) for chunk in chunked(df, chunk_size)])
+    # Baris ke-6 muncul > 1 hari setelah kemunculan sebelumnya
+    assert dup.astype(int).tolist() == [0, 1, 1, 1, 1, 1, 0, 1, 1, 1]
+
+
+@pytest.mark.parametrize('chunk_size', [1000, 16411])
+def test_bloom_dedup_ignores_timestamp(sensor_df, chunk_size):
+    n_exact = int(sensor_df.drop(columns='timestamp').duplicated().sum())
+    bloom = BloomDeduplicator(100000)
+    assert sum(bloom.check(chunk).sum() for chunk in chunked(sensor_df, chunk_size)) == n_exact
+    assert bloom._bits.dtype == np.uint8 and bloom._bits.size == (bloom.n_bits + 7) // 8
+
+
+@pytest.mark.parametrize('first, second, expected', [
+    ([1, 1, 1], [1, 2, 2], [1, 2, 3, 4, 1, 2]),
+    ([1, 2, 2], [2, 2, 3], [1, 1, 2, 3, 4, 1]),
+    ([5], [5, 5, 5], [1, 2, 3, 4]),
+    ([1, 2], [3, 4], [1, 1, 1, 1]),
+])
+def test_run_length_carries_across_chunks(first, second, expected):
+    detector = StuckSensorDetector(min_run=4, group_cols=['g'], value_cols=['v'])
+    runs = [detector.update(pd.DataFrame({'g': 'a', 'v': values})) for values in (first, second)]
+    assert pd.concat(runs).tolist() == expected
+    assert detector.summary().loc[0, 'longest_run'] == max(expected)
+
+
+def test_run_length_is_per_stream():
+    detector = StuckSensorDetector(min_run=2, group_cols=['g'], value_cols=['v'])
+    first = detector.update(pd.DataFrame({'g': ['a', 'b', 'a'], 'v': [1, 1, 1]}))
+    second = detector.update(pd.DataFrame({'g': ['b', 'a'], 'v': [1, 2]}))
+    assert first.tolist() == [1, 1, 2]
+    assert second.tolist() == [2, 1]
+    summary = detector.summary().set_index('g')
+    assert summary.loc['a', 'stuck_rows'] == 1 and summary.loc['b', 'stuck_rows'] == 1